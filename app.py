@@ -1,11 +1,14 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-import copy
 import time
-import random
 import json
 import os
+import gzip
+import shutil
+import io
+import zipfile
+import pickle
+from array import array
 
 # 1. 페이지 설정
 st.set_page_config(
@@ -92,6 +95,99 @@ st.markdown("""
 DB_FILE = 'factory_db.json'
 LOG_FILE = 'factory_logs.json'
 CONTRACT_FILE = 'factory_contracts.json'
+ARCHIVE_DIR = 'factory_logs_archive'
+ARCHIVE_INDEX = os.path.join(ARCHIVE_DIR, 'index.json')
+
+TANK_FIELDS = ('qty', 'av', 'water', 'metal', 'p', 'org_cl', 'inorg_cl')
+FIELD_INDEX = {k: i for i, k in enumerate(TANK_FIELDS)}
+N_FIELDS = len(TANK_FIELDS)
+
+class TankState:
+    """탱크 1개 상태 (재고 + 품질 6항목). 값은 array('d') 에 packed 저장.
+    TankDay 에서 꺼낸 경우 그 날짜 배열의 해당 구간을 가리키므로, 수정하면 바로 반영됨."""
+    __slots__ = ('_buf', '_off')
+
+    def __init__(self, qty=0.0, av=0.0, water=0.0, metal=0.0, p=0.0, org_cl=0.0, inorg_cl=0.0):
+        self._buf = array('d', (qty, av, water, metal, p, org_cl, inorg_cl)); self._off = 0
+
+    @classmethod
+    def view(cls, buf, off):
+        s = cls.__new__(cls); s._buf = buf; s._off = off
+        return s
+
+    # 기존 t['qty'] 형태 접근 호환
+    def __getitem__(self, key): return self._buf[self._off + FIELD_INDEX[key]]
+    def __setitem__(self, key, value): self._buf[self._off + FIELD_INDEX[key]] = value
+    def get(self, key, default=None): return self[key] if key in FIELD_INDEX else default
+
+    def copy(self): return TankState(*self.to_tuple())
+    def to_dict(self): return dict(zip(TANK_FIELDS, self.to_tuple()))
+    def to_tuple(self): return tuple(self._buf[self._off:self._off + N_FIELDS])
+
+    @classmethod
+    def from_dict(cls, d): return cls(*(float(d.get(k, 0.0)) for k in TANK_FIELDS))
+
+_LAYOUTS = {}
+
+def tank_layout(tanks):
+    """탱크 이름 -> 배열 offset. 탱크 구성이 같은 날짜들은 dict 하나를 공유"""
+    tanks = tuple(tanks)
+    if tanks not in _LAYOUTS: _LAYOUTS[tanks] = {t: i * N_FIELDS for i, t in enumerate(tanks)}
+    return _LAYOUTS[tanks]
+
+class TankDay:
+    """하루치 전체 탱크 상태. 탱크별 7개 값을 array('d') 하나에 연속 저장 (dict 처럼 사용)"""
+    __slots__ = ('_layout', '_vals')
+
+    def __init__(self, layout, vals): self._layout = layout; self._vals = vals
+
+    @classmethod
+    def from_states(cls, states):
+        vals = array('d', [v for s in states.values() for v in s.to_tuple()])
+        return cls(tank_layout(states), vals)
+
+    @classmethod
+    def from_dict(cls, raw):
+        vals = array('d', [float(d.get(k, 0.0)) for d in raw.values() for k in TANK_FIELDS])
+        return cls(tank_layout(raw), vals)
+
+    def __getitem__(self, tank): return TankState.view(self._vals, self._layout[tank])
+    def __setitem__(self, tank, state):
+        off = self._layout[tank]
+        self._vals[off:off + N_FIELDS] = array('d', state.to_tuple())
+    def __contains__(self, tank): return tank in self._layout
+    def __iter__(self): return iter(self._layout)
+    def keys(self): return self._layout.keys()
+    def values(self): return [self[t] for t in self._layout]
+    def items(self): return [(t, self[t]) for t in self._layout]
+
+    def copy(self): return TankDay(self._layout, self._vals[:])
+    def to_dict(self): return {t: s.to_dict() for t, s in self.items()}
+
+    # 바이너리 스냅샷용: (탱크 이름, float64 바이트열)
+    def to_packed(self): return (tuple(self._layout), self._vals.tobytes())
+
+    @classmethod
+    def from_packed(cls, packed):
+        tanks, raw = packed
+        vals = array('d'); vals.frombytes(raw)
+        return cls(tank_layout(tanks), vals)
+
+def day_from_json(raw): return {t: TankState.from_dict(d) for t, d in raw.items()}
+def db_from_json(raw): return {d_key: TankDay.from_dict(day) for d_key, day in raw.items()}
+
+def history_from_json(raw):
+    for h in raw:
+        h['snapshot'] = day_from_json(h.get('snapshot', {}))
+    return raw
+
+def to_jsonable(o):
+    # streamlit 은 rerun 마다 스크립트를 새로 실행하므로 세션에 남은 이전 실행의 TankState 는
+    # 현재 클래스와 다른 객체 -> isinstance 대신 to_dict 유무로 판별
+    if hasattr(o, 'to_dict'): return o.to_dict()
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+def dump_json(data): return json.dumps(data, indent=4, ensure_ascii=False, default=to_jsonable)
 
 def load_json(file_path):
     if os.path.exists(file_path):
@@ -103,25 +199,208 @@ def load_json(file_path):
 def save_json(file_path, data):
     try:
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            json.dump(data, f, indent=4, ensure_ascii=False, default=to_jsonable)
+        return True
+    except: return False
+
+# 바이너리 스냅샷: JSON 저장이 성공한 뒤에만 기록하며, 그 JSON 의 (mtime, 크기) 를 함께 저장.
+# 로드 시 현재 JSON 과 일치할 때만 사용 (JSON 이 수정/복구되면 JSON 을 읽음)
+# (TankState/TankDay 는 rerun 마다 클래스가 새로 정의되므로 pickle 에는 튜플/바이트열로 저장)
+SNAPSHOT_VERSION = 2
+
+def day_to_rows(day): return {t: s.to_tuple() for t, s in day.items()}
+def day_from_rows(rows): return {t: TankState(*r) for t, r in rows.items()}
+
+def snapshot_path(file_path): return os.path.splitext(file_path)[0] + '.bin'
+
+def json_signature(file_path):
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_snapshot(file_path):
+    try:
+        with open(snapshot_path(file_path), 'rb') as f: version, sig, data = pickle.load(f)
+        if version != SNAPSHOT_VERSION or tuple(sig) != json_signature(file_path): return None
+        return data
+    except: return None
+
+def save_snapshot(file_path, data):
+    try:
+        sig = json_signature(file_path)
+        with open(snapshot_path(file_path), 'wb') as f:
+            pickle.dump((SNAPSHOT_VERSION, sig, data), f, protocol=pickle.HIGHEST_PROTOCOL)
     except: pass
 
-def load_db(): return load_json(DB_FILE)
+def load_db():
+    data = load_snapshot(DB_FILE)
+    if data is None: return db_from_json(load_json(DB_FILE))
+    return {d_key: TankDay.from_packed(day) for d_key, day in data.items()}
 def load_logs(): 
-    data = load_json(LOG_FILE)
+    data = load_snapshot(LOG_FILE)
+    if data is None:
+        data = load_json(LOG_FILE)
+        data['history'] = history_from_json(data.get('history', []))
+    else:
+        for h in data['history']: h['snapshot'] = day_from_rows(h['snapshot'])
     return data.get('history', []), data.get('qc', []), data.get('production', {})
 def load_contracts(): return load_json(CONTRACT_FILE)
 
-def save_db_state(): save_json(DB_FILE, st.session_state.daily_db)
+def save_db_state():
+    if save_json(DB_FILE, st.session_state.daily_db):
+        save_snapshot(DB_FILE, {d_key: day.to_packed() for d_key, day in st.session_state.daily_db.items()})
 def save_logs_state():
     data = {
         'history': st.session_state.history_log,
         'qc': st.session_state.qc_log,
         'production': st.session_state.production_log
     }
-    save_json(LOG_FILE, data)
+    if save_json(LOG_FILE, data):
+        save_snapshot(LOG_FILE, dict(data, history=[dict(h, snapshot=day_to_rows(h['snapshot'])) for h in data['history']]))
 def save_contracts_state(): save_json(CONTRACT_FILE, st.session_state.contracts)
 
+# ---------------------------------------------------------
+# 이력 아카이브 (월별 압축 세그먼트 + 인덱스)
+# ---------------------------------------------------------
+
+def entry_ts(h): return h.get('ts') or f"{h['date']}T{h['time']}"
+
+def entry_key(h): return (entry_ts(h), h['date'], h['type'], h['desc'])
+
+def load_archive_index(): return load_json(ARCHIVE_INDEX).get('segments', [])
+
+def write_atomic(file_path, write):
+    """임시 파일에 쓴 뒤 os.replace 로 교체. 실패 시 예외를 그대로 올림"""
+    tmp = file_path + '.tmp'
+    write(tmp)
+    os.replace(tmp, file_path)
+
+def write_segment(path, entries):
+    def write(tmp):
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, default=to_jsonable)
+    write_atomic(path, write)
+
+def write_archive_index(segments):
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'segments': segments}, f, indent=4, ensure_ascii=False)
+    write_atomic(ARCHIVE_INDEX, write)
+
+def build_segment_index(entries):
+    """구분 -> 탱크 -> [최소 날짜, 최대 날짜, 건수]"""
+    idx = {}
+    for h in entries:
+        for t in h['snapshot']:
+            rec = idx.setdefault(h['type'], {}).setdefault(t, [h['date'], h['date'], 0])
+            rec[0] = min(rec[0], h['date']); rec[1] = max(rec[1], h['date']); rec[2] += 1
+    return idx
+
+def rotate_history_log():
+    """지난 달 이력을 불변 압축 세그먼트로 분리하고, 활성 월만 메모리에 유지.
+    이미 보관된 이력(백업 복구, 다른 세션의 저장 등)은 다시 보관하지 않음."""
+    active_month = datetime.now().strftime("%Y-%m")
+    closed = {}
+    for h in st.session_state.history_log:
+        m = entry_ts(h)[:7]
+        if m < active_month: closed.setdefault(m, []).append(h)
+    if not closed: return
+
+    segments = load_archive_index()
+    used = {seg['file'] for seg in segments}
+    archived = set()
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    for m, entries in sorted(closed.items()):
+        try:
+            seen = {entry_key(h) for seg in segments if seg['month'] == m for h in load_segment(seg['file'])}
+        except: continue
+        new_entries = []
+        for h in entries:
+            if entry_key(h) not in seen:
+                seen.add(entry_key(h)); new_entries.append(h)
+        if new_entries:
+            name = f"history_{m}.json.gz"; n = 1
+            while name in used: name = f"history_{m}.{n}.json.gz"; n += 1
+            try: write_segment(os.path.join(ARCHIVE_DIR, name), new_entries)
+            except: continue
+            dates = [h['date'] for h in new_entries]
+            segments.append({
+                'file': name, 'month': m, 'count': len(new_entries),
+                'date_min': min(dates), 'date_max': max(dates), 'index': build_segment_index(new_entries)
+            })
+            used.add(name)
+        archived.add(m)
+    if not archived: return
+
+    # 인덱스가 기록된 뒤에만 활성 로그에서 제거 (실패 시 다음 세션에서 재시도)
+    try: write_archive_index(segments)
+    except OSError:
+        st.warning("이력 아카이브 인덱스 저장 실패: 지난 달 이력을 활성 로그에 유지합니다.")
+        return
+    st.session_state.history_log = [h for h in st.session_state.history_log if entry_ts(h)[:7] not in archived]
+    save_logs_state()
+
+@st.cache_data
+def load_segment(name):
+    # 세그먼트는 불변이므로 파일명 기준 캐시
+    with gzip.open(os.path.join(ARCHIVE_DIR, name), 'rt', encoding='utf-8') as f: return json.load(f)
+
+def segment_may_match(seg, date_from, date_to, tank, action_type):
+    if seg['date_max'] < date_from or seg['date_min'] > date_to: return False
+    idx = seg.get('index', {})
+    for a_type in ([action_type] if action_type else idx):
+        tanks = idx.get(a_type, {})
+        for t in ([tank] if tank else tanks):
+            if t in tanks and tanks[t][1] >= date_from and tanks[t][0] <= date_to: return True
+    return False
+
+def query_history(date_from, date_to, tank=None, action_type=None):
+    """기간/탱크/구분 조건의 이력 조회. 인덱스로 해당 세그먼트만 읽음. (결과, 읽은 세그먼트 수) 반환"""
+    def match(h):
+        return (date_from <= h['date'] <= date_to
+                and (not action_type or h['type'] == action_type)
+                and (not tank or tank in h['snapshot']))
+    results = []
+    loaded = 0
+    for seg in load_archive_index():
+        if not segment_may_match(seg, date_from, date_to, tank, action_type): continue
+        try: entries = load_segment(seg['file'])
+        except: continue
+        loaded += 1
+        results.extend(h for h in entries if match(h))
+    results.extend(h for h in st.session_state.history_log if match(h))
+    results.sort(key=entry_ts)
+    return results, loaded
+
+def build_archive_zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as z:
+        z.write(ARCHIVE_INDEX, 'index.json')
+        for name in files: z.write(os.path.join(ARCHIVE_DIR, name), name)
+    return buf.getvalue()
+
+def restore_archive_zip(uploaded):
+    """백업 zip 으로 아카이브 폴더 전체를 교체. 인덱스에 있는 세그먼트가 모두 있어야 하며,
+    현재 아카이브에만 있는 세그먼트가 있으면 (복구 시 사라지므로) ValueError 로 거부"""
+    with zipfile.ZipFile(uploaded) as z:
+        segments = json.loads(z.read('index.json')).get('segments', [])
+        missing = {seg['file'] for seg in load_archive_index()} - {os.path.basename(seg['file']) for seg in segments}
+        if missing: raise ValueError(f"백업에 없는 세그먼트가 있습니다: {', '.join(sorted(missing))}")
+        tmp_dir = ARCHIVE_DIR + '.restore'
+        if os.path.exists(tmp_dir): shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+        for seg in segments:
+            name = os.path.basename(seg['file'])
+            with open(os.path.join(tmp_dir, name), 'wb') as f: f.write(z.read(name))
+        with open(os.path.join(tmp_dir, 'index.json'), 'wb') as f: f.write(z.read('index.json'))
+    if os.path.exists(ARCHIVE_DIR): shutil.rmtree(ARCHIVE_DIR)
+    os.replace(tmp_dir, ARCHIVE_DIR)
+    load_segment.clear()
+
+def rotate_if_month_changed():
+    # 세션이 월말을 넘겨 열려 있으면 지난 달 이력이 메모리에 남으므로 다시 분리
+    log = st.session_state.history_log
+    if log and entry_ts(log[0])[:7] < datetime.now().strftime("%Y-%m"): rotate_history_log()
+
 def init_system():
     tank_specs = {
         'TK-310':   {'max': 750,  'type': 'Buffer', 'icon': '🏭', 'color': '#2dce89'},
@@ -131,15 +410,18 @@ def init_system():
         'UTK-308':  {'max': 5400, 'type': 'Shore',  'icon': '🚢', 'color': '#5e72e4'},
         'UTK-1106': {'max': 6650, 'type': 'Shore',  'icon': '🚢', 'color': '#5e72e4'}
     }
-    default_vals = {'qty': 0.0, 'av': 0.0, 'water': 0.0, 'metal': 0.0, 'p': 0.0, 'org_cl': 0.0, 'inorg_cl': 0.0}
+    default_vals = TankState()
     
     if 'daily_db' not in st.session_state: st.session_state.daily_db = load_db()
     
     if ('history_log' not in st.session_state) or ('production_log' not in st.session_state):
         h, q, p = load_logs()
+        rotate = 'history_log' not in st.session_state
         if 'history_log' not in st.session_state: st.session_state.history_log = h
         if 'qc_log' not in st.session_state: st.session_state.qc_log = q
         if 'production_log' not in st.session_state: st.session_state.production_log = p
+        if rotate: rotate_history_log()
+    rotate_if_month_changed()
         
     if 'contracts' not in st.session_state:
         st.session_state.contracts = load_contracts()
@@ -158,7 +440,7 @@ def get_today_data(date_key, specs, defaults):
         return data
     past = find_past_data(date_key)
     if past: st.session_state.daily_db[date_key] = past
-    else: st.session_state.daily_db[date_key] = {t: defaults.copy() for t in specs}
+    else: st.session_state.daily_db[date_key] = TankDay.from_states({t: defaults.copy() for t in specs})
     save_db_state()
     return st.session_state.daily_db[date_key]
 
@@ -168,10 +450,11 @@ def find_past_data(current_date_str):
         past = (curr - timedelta(days=i)).strftime("%Y-%m-%d")
         if past in st.session_state.daily_db:
             data = st.session_state.daily_db[past]
-            if sum(t['qty'] for t in data.values()) > 0: return copy.deepcopy(data)
+            if sum(t['qty'] for t in data.values()) > 0: return data.copy()
     return None
 
 def generate_dummy_data(specs, defaults):
+    import random
     base = datetime.now()
     st.session_state.production_log = {} 
     for i in range(30, -1, -1):
@@ -187,7 +470,7 @@ def generate_dummy_data(specs, defaults):
             data['water'] = round(random.uniform(10, 100), 1)
             data['metal'] = round(random.uniform(1, 10), 1)
             new_data[t] = data
-        st.session_state.daily_db[d_key] = new_data
+        st.session_state.daily_db[d_key] = TankDay.from_states(new_data)
         st.session_state.production_log[d_key] = round(random.uniform(200, 400), 1)
     save_db_state(); save_logs_state(); st.toast("테스트 데이터 생성 완료"); time.sleep(0.5); st.rerun()
 
@@ -197,15 +480,20 @@ def factory_reset():
     st.session_state.qc_log = []
     st.session_state.production_log = {}
     st.session_state.contracts = {}
-    for f in [DB_FILE, LOG_FILE, CONTRACT_FILE]:
+    for f in [DB_FILE, LOG_FILE, CONTRACT_FILE, snapshot_path(DB_FILE), snapshot_path(LOG_FILE)]:
         if os.path.exists(f): os.remove(f)
+    if os.path.exists(ARCHIVE_DIR): shutil.rmtree(ARCHIVE_DIR)
+    load_segment.clear()
     st.rerun()
 
 def log_action(date_key, action_type, desc, tanks_involved, current_db):
     snapshot = {}
-    for t in tanks_involved: snapshot[t] = copy.deepcopy(current_db[t])
+    for t in tanks_involved: snapshot[t] = current_db[t].copy()
+    rotate_if_month_changed()
+    now = datetime.now()
     st.session_state.history_log.append({
-        "time": datetime.now().strftime("%H:%M:%S"), "date": date_key, "type": action_type, "desc": desc, "snapshot": snapshot
+        "ts": now.isoformat(timespec="seconds"), "time": now.strftime("%H:%M:%S"),
+        "date": date_key, "type": action_type, "desc": desc, "snapshot": snapshot
     })
     save_logs_state()
 
@@ -265,7 +553,8 @@ with st.sidebar:
         "2. 운영 실적 입력 (Input)", 
         "3. Lab 분석 보정 (Correction)",
         "4. 계약 품질 관리 (Contract)", 
-        "5. QC 오차 분석 (Analysis)"
+        "5. QC 오차 분석 (Analysis)",
+        "6. 이력 감사 (Audit)"
     ])
     
     st.markdown("---")
@@ -276,12 +565,17 @@ with st.sidebar:
     with st.expander("🛠️ 시스템 관리 (백업/복구)"):
         st.markdown("##### 💾 데이터 백업")
         
-        db_json = json.dumps(st.session_state.daily_db, indent=4, ensure_ascii=False)
-        st.download_button("DB 다운로드 (.json)", db_json, file_name="factory_db.json", mime="application/json")
+        # 파일 내용은 버튼을 누를 때 생성 (매 렌더링마다 전체 DB 를 직렬화하지 않도록)
+        db_data = st.session_state.daily_db
+        st.download_button("DB 다운로드 (.json)", lambda: dump_json(db_data), file_name="factory_db.json", mime="application/json")
         
         log_data = {'history': st.session_state.history_log, 'qc': st.session_state.qc_log, 'production': st.session_state.production_log}
-        log_json = json.dumps(log_data, indent=4, ensure_ascii=False)
-        st.download_button("로그 다운로드 (.json)", log_json, file_name="factory_logs.json", mime="application/json")
+        st.download_button("로그 다운로드 (.json)", lambda: dump_json(log_data), file_name="factory_logs.json", mime="application/json")
+        
+        archive_files = tuple(seg['file'] for seg in load_archive_index())
+        if archive_files:
+            st.caption("로그 파일에는 이번 달 이력만 포함됩니다. 지난 달 이력은 아카이브로 백업하세요.")
+            st.download_button("이력 아카이브 다운로드 (.zip)", lambda: build_archive_zip(archive_files), file_name="factory_logs_archive.zip", mime="application/zip")
         
         cont_json = json.dumps(st.session_state.contracts, indent=4, ensure_ascii=False)
         st.download_button("계약서 다운로드 (.json)", cont_json, file_name="factory_contracts.json", mime="application/json")
@@ -291,17 +585,27 @@ with st.sidebar:
         
         u_db = st.file_uploader("DB 파일", type=['json'], key="u_db")
         if u_db:
-            try: st.session_state.daily_db = json.load(u_db); save_db_state(); st.success("DB 복구 완료")
+            try: st.session_state.daily_db = db_from_json(json.load(u_db)); save_db_state(); st.success("DB 복구 완료")
             except: st.error("파일 오류")
             
         u_log = st.file_uploader("로그 파일", type=['json'], key="u_log")
         if u_log:
             try: 
                 d = json.load(u_log)
-                st.session_state.history_log = d.get('history', [])
+                st.session_state.history_log = history_from_json(d.get('history', []))
                 st.session_state.qc_log = d.get('qc', [])
                 st.session_state.production_log = d.get('production', {})
-                save_logs_state(); st.success("로그 복구 완료")
+                save_logs_state(); rotate_history_log(); st.success("로그 복구 완료")
+            except: st.error("파일 오류")
+            
+        u_arc = st.file_uploader("이력 아카이브 파일", type=['zip'], key="u_arc")
+        # 업로더에 파일이 남아 있는 동안 rerun 마다 다시 복구하지 않도록 file_id 기준으로 1회만 적용
+        if u_arc and st.session_state.get('archive_restored_id') != u_arc.file_id:
+            try:
+                restore_archive_zip(u_arc)
+                st.session_state.archive_restored_id = u_arc.file_id
+                st.success("아카이브 복구 완료")
+            except ValueError as e: st.error(f"복구 거부: {e}")
             except: st.error("파일 오류")
             
         u_cont = st.file_uploader("계약서 파일", type=['json'], key="u_cont")
@@ -408,17 +712,22 @@ if menu == "1. 통합 대시보드 (Dashboard)":
             st.markdown(card_html, unsafe_allow_html=True)
             
     with st.expander("📋 전체 데이터 테이블 보기"):
-        rows = []
+        # 첫 화면이므로 st.dataframe(pandas 로드 필요) 대신 HTML 표로 표시
+        headers = ["탱크", "구분", "재고", "AV", "Water", "Total Cl", "Org Cl", "InOrg Cl", "P", "Total Metal"]
+        cell = 'padding:6px 10px; border-bottom:1px solid #e9ecef; text-align:right;'
+        table_html = (
+            '<table style="width:100%; border-collapse:collapse; font-size:0.85rem; background:white;">'
+            '<tr>' + ''.join(f'<th style="{cell} color:#8898aa; font-weight:600;">{h}</th>' for h in headers) + '</tr>'
+        )
         for t in SPECS:
             d = TODAY_DATA[t]
-            rows.append({
-                "탱크": t, "구분": SPECS[t]['type'],
-                "재고": d['qty'], "AV": d['av'], "Water": d['water'],
-                "Total Cl": d.get('org_cl', 0) + d.get('inorg_cl', 0),
-                "Org Cl": d.get('org_cl', 0), "InOrg Cl": d.get('inorg_cl', 0),
-                "P": d['p'], "Total Metal": d['metal']
-            })
-        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            vals = [
+                t, SPECS[t]['type'], f"{d['qty']:.1f}", f"{d['av']:.2f}", f"{d['water']:.1f}",
+                f"{d.get('org_cl', 0) + d.get('inorg_cl', 0):.1f}", f"{d.get('org_cl', 0):.1f}", f"{d.get('inorg_cl', 0):.1f}",
+                f"{d['p']:.1f}", f"{d['metal']:.1f}"
+            ]
+            table_html += '<tr>' + ''.join(f'<td style="{cell}">{v}</td>' for v in vals) + '</tr>'
+        st.markdown(table_html + '</table>', unsafe_allow_html=True)
 
 # ---------------------------------------------------------
 # 2. 운영 실적 입력
@@ -520,7 +829,7 @@ elif menu == "2. 운영 실적 입력 (Input)":
                         src = TODAY_DATA[f]; tgt = TODAY_DATA[t]
                         if src['qty'] < q: st.error("부족")
                         else:
-                            for k in DEFAULTS: 
+                            for k in TANK_FIELDS: 
                                 if k!='qty': tgt[k] = calc_blend(tgt['qty'], tgt[k], q, src[k])
                             src['qty'] -= q; tgt['qty'] += q
                             save_db_state(); st.success("완료"); st.rerun()
@@ -541,6 +850,7 @@ elif menu == "2. 운영 실적 입력 (Input)":
 # 3. Lab 분석 보정 (Correction)
 # ---------------------------------------------------------
 elif menu == "3. Lab 분석 보정 (Correction)":
+    import pandas as pd  # pandas 는 표가 있는 페이지에서만 로드 (초기 구동 속도)
     
     with st.container(border=True):
         st.subheader("🧪 Lab 데이터 보정")
@@ -610,6 +920,7 @@ elif menu == "3. Lab 분석 보정 (Correction)":
 # 4. 계약 품질 관리 (Contract)
 # ---------------------------------------------------------
 elif menu == "4. 계약 품질 관리 (Contract)":
+    import pandas as pd
     st.subheader("📑 거래처 계약 스펙 관리")
     
     with st.container(border=True):
@@ -664,6 +975,7 @@ elif menu == "4. 계약 품질 관리 (Contract)":
 # 5. QC 오차 분석 (Improved Table View)
 # ---------------------------------------------------------
 elif menu == "5. QC 오차 분석 (Analysis)":
+    import pandas as pd
     st.subheader("📈 QC 오차 트렌드 (상세)")
     
     if not st.session_state.qc_log:
@@ -701,4 +1013,34 @@ elif menu == "5. QC 오차 분석 (Analysis)":
                     }
                 )
             else:
-                st.warning("선택된 조건에 맞는 데이터가 없습니다.")
\ No newline at end of file
+                st.warning("선택된 조건에 맞는 데이터가 없습니다.")
+
+# ---------------------------------------------------------
+# 6. 이력 감사 (Audit)
+# ---------------------------------------------------------
+elif menu == "6. 이력 감사 (Audit)":
+    import pandas as pd
+    st.subheader("🔍 작업 이력 감사")
+    
+    with st.container(border=True):
+        c1, c2, c3 = st.columns([2, 1, 1])
+        period = c1.date_input("조회 기간", (datetime.now() - timedelta(days=90), datetime.now()))
+        a_tank = c2.selectbox("탱크", ["전체"] + list(SPECS.keys()))
+        a_type = c3.selectbox("구분", ["전체", "입고", "생산", "이송", "선적", "분석반영"])
+    
+    if len(period) != 2:
+        st.info("조회 기간의 시작/종료 날짜를 선택하세요.")
+    else:
+        rows, loaded = query_history(
+            period[0].strftime("%Y-%m-%d"), period[1].strftime("%Y-%m-%d"),
+            None if a_tank == "전체" else a_tank, None if a_type == "전체" else a_type
+        )
+        st.caption(f"보관 세그먼트 {len(load_archive_index())}개 중 {loaded}개 조회 · 결과 {len(rows)}건")
+        if rows:
+            df_a = pd.DataFrame([{
+                "일시": entry_ts(h).replace("T", " "), "날짜": h['date'], "구분": h['type'],
+                "내용": h['desc'], "탱크": ", ".join(h['snapshot'])
+            } for h in rows])
+            st.dataframe(df_a, hide_index=True, use_container_width=True)
+        else:
+            st.warning("선택된 조건에 맞는 이력이 없습니다.")
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""초기 구동(첫 화면 렌더링) 벤치마크: JSON 로드 vs 바이너리 스냅샷 로드
+
+다년치 가상 DB/로그를 임시 폴더에 만든 뒤, 매 측정마다 새 프로세스에서
+streamlit AppTest 로 app.py 를 1회 실행해 첫 렌더링 시간을 잰다.
+디스크 캐시 조건을 같게 하려고 모드별 측정을 번갈아 실행한다.
+
+  Snapshot : DB/로그 모두 .bin 스냅샷에서 로드
+  JSON     : .bin 을 치워두고 JSON 에서 로드
+  Baseline : --baseline 으로 지정한 git 리비전의 app.py (변경 전 비교용)
+
+사용법: python bench_startup.py [--years 3] [--runs 5] [--baseline <git rev>]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+TANKS = ['TK-310', 'TK-710', 'TK-720', 'TK-6101', 'UTK-308', 'UTK-1106']
+FIELDS = ('qty', 'av', 'water', 'metal', 'p', 'org_cl', 'inorg_cl')
+
+RUNNER = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+elapsed = time.perf_counter() - t0
+if at.exception: raise SystemExit(str(at.exception))
+print(elapsed, int('pandas' in sys.modules))
+"""
+
+PANDAS_IMPORT = """
+import time
+t0 = time.perf_counter()
+import pandas
+print(time.perf_counter() - t0)
+"""
+
+
+def history_entry(day, n, db):
+    tanks = random.sample(TANKS, 2)
+    return {
+        "ts": day.strftime("%Y-%m-%d") + f"T10:{n:02d}:00", "time": f"10:{n:02d}:00",
+        "date": day.strftime("%Y-%m-%d"), "type": "이송", "desc": f"{tanks[0]}->{tanks[1]} 10.0",
+        "snapshot": {t: db[max(db)][t] for t in tanks}
+    }
+
+
+def make_data(work_dir, years):
+    # 오늘 날짜는 빼둔다: 첫 실행(setup)에서 앱이 오늘 데이터를 만들며 DB JSON + 스냅샷을 저장
+    today = datetime.now()
+    db, production, history, qc = {}, {}, [], []
+    for i in range(years * 365, 0, -1):
+        d_key = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+        db[d_key] = {t: {k: round(random.uniform(1, 500), 2) for k in FIELDS} for t in TANKS}
+        production[d_key] = round(random.uniform(200, 400), 1)
+        qc.append({"날짜": d_key, "탱크": random.choice(TANKS), "항목": "AV", "예상값": 0.5, "실측값": 0.6, "오차": 0.1})
+    # 지난 달 이력 일부: setup 실행에서 아카이브로 분리되며 로그 JSON + 스냅샷이 저장됨
+    last_month = today.replace(day=1) - timedelta(days=1)
+    history += [history_entry(last_month, n, db) for n in range(20)]
+    # 이번 달 이력 (1일 ~ 오늘)
+    for i in range(today.day):
+        history += [history_entry(today.replace(day=i + 1), n, db) for n in range(20)]
+    with open(os.path.join(work_dir, 'factory_db.json'), 'w', encoding='utf-8') as f:
+        json.dump(db, f, indent=4, ensure_ascii=False)
+    with open(os.path.join(work_dir, 'factory_logs.json'), 'w', encoding='utf-8') as f:
+        json.dump({'history': history, 'qc': qc, 'production': production}, f, indent=4, ensure_ascii=False)
+
+
+def run_once(work_dir, app=APP):
+    """(첫 렌더링 시간, 렌더링 중 pandas 로드 여부)"""
+    out = subprocess.run([sys.executable, '-c', RUNNER, app], cwd=work_dir,
+                         capture_output=True, text=True, check=True)
+    elapsed, pandas_loaded = out.stdout.strip().splitlines()[-1].split()
+    return float(elapsed), pandas_loaded == '1'
+
+
+def pandas_import_time():
+    out = subprocess.run([sys.executable, '-c', PANDAS_IMPORT], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+def toggle_snapshots(work_dir, enabled):
+    for name in ['factory_db.bin', 'factory_logs.bin']:
+        on, off = os.path.join(work_dir, name), os.path.join(work_dir, name + '.off')
+        if enabled and os.path.exists(off): os.replace(off, on)
+        if not enabled and os.path.exists(on): os.replace(on, off)
+
+
+def report(label, results):
+    median = statistics.median(t for t, _ in results) * 1000
+    pandas_loaded = any(p for _, p in results)
+    print(f"  {label:<9}: {median:8.1f} ms   (pandas 로드: {pandas_loaded})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--baseline', help="비교할 이전 app.py 의 git 리비전 (예: 변경 전 커밋)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='factory_bench_')
+    try:
+        baseline_app = None
+        if args.baseline:
+            baseline_app = os.path.join(tempfile.mkdtemp(dir=work_dir), 'app.py')
+            with open(baseline_app, 'wb') as f:
+                f.write(subprocess.run(['git', 'show', f'{args.baseline}:app.py'], cwd=os.path.dirname(APP),
+                                       capture_output=True, check=True).stdout)
+
+        make_data(work_dir, args.years)
+        run_once(work_dir)  # setup: 오늘 DB 데이터 생성 + 지난 달 이력 아카이브 -> DB/로그 스냅샷 저장
+        for name in ['factory_db.bin', 'factory_logs.bin']:
+            if not os.path.exists(os.path.join(work_dir, name)): raise SystemExit(f"setup 실행 후 {name} 없음")
+
+        snap, plain, base = [], [], []
+        for _ in range(args.runs):
+            toggle_snapshots(work_dir, True); snap.append(run_once(work_dir))
+            toggle_snapshots(work_dir, False); plain.append(run_once(work_dir))
+            if baseline_app: base.append(run_once(work_dir, baseline_app))
+        pandas_cost = statistics.median(pandas_import_time() for _ in range(args.runs))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"DB {args.years}년치, {args.runs}회 측정 (중앙값)")
+    if base: report("Baseline", base)
+    report("JSON", plain)
+    report("Snapshot", snap)
+    print(f"  (참고) pandas import 비용: {pandas_cost * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file